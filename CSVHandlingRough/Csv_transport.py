@@ -1,5 +1,6 @@
 import pandas as pd
 import re
+import sys
 from datetime import datetime
 
 # Configure pandas display options for better output visibility
@@ -7,13 +8,18 @@ pd.set_option("display.max_columns", None)
 pd.set_option("display.width", None)
 
 
-def process_csv_data():
+def process_csv_data(engine="pandas"):
     """
     function to read CSV, apply transformations, and save the output.
     Processes CSV data with column formatting, validation, and date conversion.
+
+    Args:
+        engine: "pandas" for the default reader/writer, or "pyarrow" to read and
+                write with the multi-threaded Arrow CSV engine and keep every
+                column as an Arrow-backed dtype
     """
     # Read CSV file
-    df = pd.read_csv("/Users/shravakjain/Library/CloudStorage/OneDrive-Personal/Xero_Data/Contacts_20260112_174755.csv")
+    df = read_csv("/Users/shravakjain/Library/CloudStorage/OneDrive-Personal/Xero_Data/Contacts_20260112_174755.csv", engine)
     
     # print(df.head)
     # print(df.columns.tolist())
@@ -49,10 +55,136 @@ def process_csv_data():
     # Save transformed data with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_path = f"/Users/shravakjain/Library/CloudStorage/OneDrive-Personal/Xero_Data/Contacts_20260112_174755_{timestamp}.csv"
-    df.to_csv(output_path, index=False)
+    write_csv(df, output_path, engine)
     print(f"\nData successfully saved to: {output_path}")
 
 
+# ---------------------------- CSV Engine ------------------------
+def read_csv(path, engine="pandas"):
+    """
+    Read a CSV file with the selected engine.
+
+    The pyarrow engine parses the file on all cores and keeps columns as
+    Arrow-backed dtypes, so strings are stored in Arrow buffers instead of
+    one Python object per value.
+
+    Args:
+        path: CSV file to read
+        engine: "pandas" or "pyarrow"
+
+    Returns:
+        DataFrame with the file contents
+    """
+    if engine == "pyarrow":
+        return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    if engine != "pandas":
+        raise ValueError(f"Unknown CSV engine '{engine}'. Expected 'pandas' or 'pyarrow'")
+    return pd.read_csv(path)
+
+
+def write_csv(df, path, engine="pandas"):
+    """
+    Write a DataFrame to CSV with the selected engine.
+
+    Both engines write the same values: the pyarrow engine renders them the
+    way pandas does (True/False, 3.0, 2020-09-13 17:56:40+05:30). Unlike
+    pandas, the pyarrow engine quotes every string field, so the files hold
+    the same data but are not byte-for-byte identical.
+
+    Args:
+        df: DataFrame to save
+        path: Output CSV file
+        engine: "pandas" or "pyarrow"
+    """
+    if engine != "pyarrow":
+        df.to_csv(path, index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # Arrow-backed columns are handed over without converting them back to Python objects
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = pa.table([render_text(column) for column in table.columns], names=table.column_names)
+    pa_csv.write_csv(table, path)
+
+
+def render_text(array):
+    """
+    Render an Arrow column as the text pandas would write for it.
+
+    Arrow's own string cast writes booleans as true/false, whole floats
+    without .0 and timestamps as 2020-09-13 17:56:40.000+0530, so each of
+    those is rendered the pandas way instead. Nulls stay null.
+
+    Args:
+        array: Arrow array or chunked array
+
+    Returns:
+        Arrow string array
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    kind = array.type
+    if pa.types.is_string(kind) or pa.types.is_large_string(kind):
+        return array
+    if pa.types.is_boolean(kind):
+        return pc.if_else(array, "True", "False")
+    if pa.types.is_floating(kind):
+        # numpy prints floats like Python's repr, which is what pandas writes
+        text = array.to_numpy(zero_copy_only=False).astype(str)
+        return pa.array(text, type=pa.string(), mask=array.is_null().to_numpy(zero_copy_only=False))
+    if pa.types.is_timestamp(kind):
+        # Microseconds only when there are any and the offset as +05:30, like str(pd.Timestamp)
+        offset = "%Ez" if kind.tz else ""
+        text = pc.strftime(array.cast(pa.timestamp("us", tz=kind.tz)), f"%Y-%m-%d %H:%M:%S{offset}")
+        return pc.replace_substring_regex(text, r"\.000000(\+|-|$)", r"\1")
+    return array.cast(pa.string())
+
+
+def is_arrow_backed(df):
+    """Return True when the DataFrame holds Arrow-backed columns (read with the pyarrow engine)."""
+    return any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+
+def fill_missing(df, value):
+    """
+    Fill null fields with a placeholder.
+
+    Arrow-backed columns are typed, so non-string columns that contain nulls
+    are rendered as text before the placeholder text is filled in. Integer
+    columns with nulls are rendered as floats (1234567890.0), as pandas
+    reads them as floats.
+
+    Args:
+        df: Input DataFrame
+        value: Placeholder text
+
+    Returns:
+        DataFrame without nulls
+    """
+    if not is_arrow_backed(df):
+        df.fillna(value, inplace=True)
+        return df
+
+    import pyarrow as pa
+
+    for column in df.columns:
+        if not df[column].isna().any():
+            continue
+        dtype = df[column].dtype
+        if not (isinstance(dtype, pd.ArrowDtype) and pa.types.is_string(dtype.pyarrow_dtype)):
+            values = pa.array(df[column])
+            if pa.types.is_integer(values.type):
+                values = values.cast(pa.float64())
+            df[column] = pd.Series(pd.arrays.ArrowExtensionArray(render_text(values)), index=df.index)
+        df[column] = df[column].fillna(value)
+    return df
+
+
 # ---------------------------- Rename Column ------------------------
 def format_column_names(df):
     """
@@ -72,7 +204,7 @@ def format_column_names(df):
     # }, inplace=True)
 
     # Fill null fields with placeholder text
-    df.fillna("Not available", inplace=True)
+    df = fill_missing(df, "Not available")
 
     # Use regex with word boundaries to match only complete abbreviations
     replacements = [
@@ -136,6 +268,18 @@ def add_validation_columns(df):
     # )
 
     # This also add new column based on the condition but get inserted at specific index
+    if is_arrow_backed(df):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # Same check with Arrow compute kernels, keeping both new columns Arrow-backed
+        string_type = pd.ArrowDtype(pa.string())
+        df["Source"] = df["Source"].astype(string_type)
+        lengths = pc.utf8_length(pa.array(df["Contact_Number"].astype(string_type)))
+        validate = pc.if_else(pc.equal(lengths, 10), "Valid", "Invalid")
+        df.insert(3, "Contact_Number_Validate", pd.Series(pd.arrays.ArrowExtensionArray(validate), index=df.index))
+        return df
+
     df.insert(3, "Contact_Number_Validate", df["Contact_Number"].apply(
         lambda x: "Valid" if len(str(x)) == 10 else "Invalid"
     ))
@@ -153,6 +297,9 @@ def convert_utc_to_local_time(df):
     Returns:
         DataFrame with formatted date column
     """
+    if is_arrow_backed(df):
+        return convert_utc_to_local_time_arrow(df)
+
     # Extract numeric timestamp from string
     df["Updated_Date_U_T_C"] = (df["Updated_Date_U_T_C"]
                                 .astype(str)  # It forces every value to become a string
@@ -171,5 +318,34 @@ def convert_utc_to_local_time(df):
     return df
 
 
+def convert_utc_to_local_time_arrow(df):
+    """
+    Arrow-backed version of convert_utc_to_local_time.
+
+    Runs the digit extraction, millisecond conversion and timezone change as
+    Arrow compute kernels, so the column never becomes Python objects.
+
+    Args:
+        df: Input DataFrame with Arrow-backed columns
+
+    Returns:
+        DataFrame with formatted date column
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pa.array(df["Updated_Date_U_T_C"].astype(pd.ArrowDtype(pa.string())))
+
+    # Values without digits (e.g. "Not available") become null, like errors='coerce'
+    digits = pc.struct_field(pc.extract_regex(values, r"(?P<ms>\d+)"), [0])
+    utc = pc.cast(digits, pa.int64()).cast(pa.timestamp("ms", tz="UTC"))
+
+    # Timestamps are stored as UTC instants, so changing the zone only changes how they are shown
+    local = utc.cast(pa.timestamp("ms", tz="Asia/Kolkata"))
+    df["Updated_Date_U_T_C"] = pd.Series(pd.arrays.ArrowExtensionArray(local), index=df.index)
+    return df
+
+
 if __name__ == '__main__':
-    process_csv_data()
+    # Optional engine argument: pandas (default) or pyarrow
+    process_csv_data(sys.argv[1] if len(sys.argv) > 1 else "pandas")
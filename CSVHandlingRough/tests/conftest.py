@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Csv_transport.py is a script, imported by name from its own folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
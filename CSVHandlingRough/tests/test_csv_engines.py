@@ -0,0 +1,46 @@
+import csv
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+import Csv_transport as transport
+
+CONTACTS = (
+    "ContactID,ContactNumber,Name,Balance,IsSupplier,TaxNumber,UpdatedDateUTC\n"
+    "a1,1234567890,Alice,10.5,True,101,/Date(1573755038314+0000)/\n"
+    "b2,,Bob,,False,102,\n"
+    'c3,12345,"Carol ""CJ"" O\'Neil",3,True,103,/Date(1600000000000+0000)/\n'
+    'd4,9876543210,"Dave, Ltd",1e-05,False,104,/Date(1600000000000+0000)/\n'
+)
+
+def transform(path, engine):
+    df = transport.read_csv(path, engine)
+    df = transport.format_column_names(df)
+    df = transport.add_validation_columns(df)
+    return transport.convert_utc_to_local_time(df)
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+class TestCsvEngines:
+    def test_engines_write_the_same_data(self, tmp_path):
+        source = tmp_path / "contacts.csv"
+        source.write_text(CONTACTS)
+        rows = {}
+        for engine in ("pandas", "pyarrow"):
+            path = tmp_path / f"{engine}.csv"
+            transport.write_csv(transform(source, engine), path, engine)
+            with open(path, newline="") as f:
+                rows[engine] = list(csv.reader(f))
+        assert rows["pyarrow"] == rows["pandas"]
+
+    def test_pandas_rendering(self, tmp_path):
+        source = tmp_path / "contacts.csv"
+        source.write_text(CONTACTS)
+        path = tmp_path / "out.csv"
+        transport.write_csv(transform(source, "pyarrow"), path, "pyarrow")
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[1] == ["a1", "XeroDataSource", "1234567890.0", "Invalid", "Alice", "10.5", "True", "101",
+                           "2019-11-14 23:40:38.314000+05:30"]
+        assert rows[3][4:] == ['Carol "CJ" O\'Neil', "3.0", "True", "103", "2020-09-13 17:56:40+05:30"]
+        assert rows[4][4:6] == ["Dave, Ltd", "1e-05"]
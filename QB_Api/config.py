@@ -1,20 +1,51 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+QB_TOKEN_URL = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
 
-QB_CLIENT_ID = os.getenv("QB_CLIENT_ID")
-QB_CLIENT_SECRET = os.getenv("QB_CLIENT_SECRET")
-QB_REALM_ID = os.getenv("QB_REALM_ID")
-QB_ENV = os.getenv("QB_ENV", "sandbox")
 
-if not all([QB_CLIENT_ID, QB_CLIENT_SECRET, QB_REALM_ID]):
-    raise ValueError("Missing required environment variables: QB_CLIENT_ID, QB_CLIENT_SECRET, QB_REALM_ID")
+def read_settings():
+    # Settings come from the environment; validate_config() reads them again once .env is loaded
+    global QB_CLIENT_ID, QB_CLIENT_SECRET, QB_REALM_ID, QB_ENV, QB_JSON_DECODER, QB_OUTPUT_MODE
+    global QB_OUTPUT_ROOT, QB_OUTPUT_COMPRESSION, QB_SCRATCH_DIR, QB_COMPACT_EVERY, QB_PREVIEW_ROWS, QB_BASE_URL
+    QB_CLIENT_ID = os.getenv("QB_CLIENT_ID")
+    QB_CLIENT_SECRET = os.getenv("QB_CLIENT_SECRET")
+    QB_REALM_ID = os.getenv("QB_REALM_ID")
+    QB_ENV = os.getenv("QB_ENV", "sandbox")
+    # auto, stream (ijson), fast (orjson) or standard
+    QB_JSON_DECODER = os.getenv("QB_JSON_DECODER", "auto")
+    # snapshot: per-entity base + delta files, full: a complete timestamped CSV per run
+    QB_OUTPUT_MODE = os.getenv("QB_OUTPUT_MODE", "snapshot")
+    # Where exports are published (defaults to the OneDrive QB_CSV_Files folder),
+    # how they are compressed (none, gzip or zstd) and where they are staged first
+    QB_OUTPUT_ROOT = os.getenv("QB_OUTPUT_ROOT")
+    QB_OUTPUT_COMPRESSION = os.getenv("QB_OUTPUT_COMPRESSION", "none")
+    QB_SCRATCH_DIR = os.getenv("QB_SCRATCH_DIR")
+    try:
+        QB_COMPACT_EVERY = int(os.getenv("QB_COMPACT_EVERY", 10))
+    except (ValueError, TypeError):
+        QB_COMPACT_EVERY = 10
+    # Rows printed as a table before saving (needs tabulate); 0 turns the preview off
+    try:
+        QB_PREVIEW_ROWS = int(os.getenv("QB_PREVIEW_ROWS", 100))
+    except (ValueError, TypeError):
+        QB_PREVIEW_ROWS = 100
 
-QB_BASE_URL = (
-    "https://sandbox-quickbooks.api.intuit.com"
-    if QB_ENV == "sandbox"
-    else "https://quickbooks.api.intuit.com"
-)
+    QB_BASE_URL = (
+        "https://sandbox-quickbooks.api.intuit.com"
+        if QB_ENV == "sandbox"
+        else "https://quickbooks.api.intuit.com"
+    )
 
-QB_TOKEN_URL = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
\ No newline at end of file
+
+read_settings()
+
+
+def validate_config():
+    # Called once the user has picked an API, so the menu comes up without
+    # importing dotenv or reading .env
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    read_settings()
+    if not all([QB_CLIENT_ID, QB_CLIENT_SECRET, QB_REALM_ID]):
+        raise ValueError("Missing required environment variables: QB_CLIENT_ID, QB_CLIENT_SECRET, QB_REALM_ID")
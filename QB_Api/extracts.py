@@ -0,0 +1,98 @@
+import json
+import re
+from pathlib import Path
+
+# Comparison operators supported by the QuickBooks query language
+OPERATORS = ("=", "<", ">", "<=", ">=", "IN", "LIKE")
+
+
+def load_extract_spec(path):
+    """
+    Load an extract spec from a JSON file.
+
+    A spec names the entity to pull and, optionally, the columns to select,
+    filters to apply on the server and the ordering, e.g.
+
+        {
+            "entity": "Invoice",
+            "columns": ["DocNumber", "TotalAmt", "Balance"],
+            "filters": [{"column": "Balance", "op": ">", "value": 0}],
+            "order": ["TxnDate DESC"]
+        }
+    """
+    with open(Path(path).expanduser()) as f:
+        spec = json.load(f)
+    if not spec.get("entity"):
+        raise ValueError(f"Extract spec {path} has no entity")
+    return spec
+
+
+def format_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return "(" + ", ".join(format_value(v) for v in value) + ")"
+    escaped = str(value).replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def compile_query(spec):
+    """
+    Compile an extract spec into a QuickBooks query.
+
+    Only the listed columns are selected (plus Id, which snapshots are keyed
+    on) and filters become a WHERE clause, so QuickBooks drops the rest of
+    the data before it is sent. QuickBooks only supports AND between filters.
+    """
+    columns = spec.get("columns") or []
+    if columns and "Id" not in columns:
+        columns = ["Id"] + list(columns)
+    query = f"SELECT {', '.join(columns) if columns else '*'} FROM {spec['entity']}"
+
+    conditions = []
+    for condition in spec.get("filters") or []:
+        op = condition.get("op", "=").upper()
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}'. Expected one of: {', '.join(OPERATORS)}")
+        if op == "IN" and not isinstance(condition["value"], (list, tuple)):
+            raise ValueError(f"IN filter on {condition['column']} needs a list of values")
+        conditions.append(f"{condition['column']} {op} {format_value(condition['value'])}")
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    order = spec.get("order") or []
+    if order:
+        query += " ORDERBY " + ", ".join(order)
+    return query
+
+
+def compile_projection(spec):
+    """Columns a spec selects, or None for a full SELECT *; projected snapshots are stored apart."""
+    columns = spec.get("columns") or []
+    if not columns:
+        return None
+    return sorted(set(columns) | {"Id"})
+
+
+def describe_query(query):
+    """
+    Work out how a raw query's results can be snapshotted.
+
+    Only SELECT * FROM <entity> without WHERE or paging returns every full
+    record, so only that can detect deletes and update the entity's main
+    snapshot. A select list (including aggregates such as COUNT(*)) is kept
+    in a snapshot of its own, like a spec with columns.
+
+    Returns:
+        (entity, full_extract, projection)
+    """
+    match = re.match(r"\s*SELECT\s+(.+?)\s+FROM\s+(\w+)(.*)$", query, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return "query_result", False, None
+    select, entity, rest = match.groups()
+    filtered = re.search(r"\b(WHERE|STARTPOSITION|MAXRESULTS)\b", rest, re.IGNORECASE)
+    if select.strip() == "*":
+        return entity, not filtered, None
+    return entity, False, sorted(column.strip() for column in select.split(","))
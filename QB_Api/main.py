@@ -2,21 +2,23 @@ import os
 import time
 import json
 import base64
-import requests
 import logging
-import csv
+import sys
 from pathlib import Path
 from datetime import datetime
-from tabulate import tabulate
 import re
 
-from config import (
-    QB_CLIENT_ID,
-    QB_CLIENT_SECRET,
-    QB_BASE_URL,
-    QB_TOKEN_URL,
-    QB_REALM_ID
-)
+# Helpers shared with the Xero exporter live in etl_common/ next to this folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from etl_common.pipeline import run_pipeline, CsvFileSink
+from etl_common.decoding import decode_json, iter_json_records
+from etl_common.snapshots import SnapshotSink
+from extracts import load_extract_spec, compile_query, compile_projection, describe_query
+
+# requests and tabulate are imported where they are used, and .env is only read
+# by config.validate_config(), so the script reaches its first prompt without
+# loading them (see startup_benchmark.py)
+import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -66,47 +68,93 @@ def flatten_dict(d, parent_key='', sep='_'):
             items.append((new_key, v))
     return dict(items)
 
-def display_table_and_save_csv(data, entity_type):
-    if not data:
-        print("No data to display")
-        return
-    flattened_data = [flatten_dict(record) for record in data]
-
-    all_keys = set()
-    for record in flattened_data:
-        all_keys.update(record.keys())
-    all_keys = sorted(list(all_keys))
-
-    key_mapping = {key: format_column_name(key) for key in all_keys}
-    formatted_headers = list(key_mapping.values())
+# Formatted names of raw flattened keys, reused across pages
+_column_names = {}
 
+def transform_records(records):
+    """Flatten a batch of records and rename their keys to readable column names."""
     transformed_data = []
-    for record in flattened_data:
-        new_record  = {key_mapping[k]: v for k, v in record.items()}
+    for record in records:
+        flat = flatten_dict(record)
+        new_record = {}
+        for k, v in flat.items():
+            if k not in _column_names:
+                _column_names[k] = format_column_name(k)
+            new_record[_column_names[k]] = v
         transformed_data.append(new_record)
+    return transformed_data
 
-    display_data = transformed_data[:100]
-    table_data = []
-    for record in display_data:
-        row = [str(record.get(key, '')) if record.get(key) is not None else '' for key in formatted_headers]
-        table_data.append(row)
+class TablePreviewSink:
+    """Pipeline sink that prints the first rows of the extract as a table."""
 
-    print(tabulate(table_data, headers=formatted_headers, tablefmt="simple"))
-    
-    save_dir = Path.home() / "Library" / "CloudStorage" / "OneDrive-Personal" / "QB_CSV_Files"
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.headers = set()
+        self.preview = []
+
+    def write(self, records):
+        for record in records:
+            self.headers.update(record.keys())
+        self.preview.extend(records[:self.limit - len(self.preview)])
+
+    def close(self):
+        if not self.preview:
+            return
+        from tabulate import tabulate
+
+        formatted_headers = sorted(self.headers)
+        table_data = []
+        for record in self.preview:
+            row = [str(record.get(key, '')) if record.get(key) is not None else '' for key in formatted_headers]
+            table_data.append(row)
+        print(tabulate(table_data, headers=formatted_headers, tablefmt="simple"))
+
+def get_save_dir():
+    if config.QB_OUTPUT_ROOT:
+        save_dir = Path(config.QB_OUTPUT_ROOT).expanduser()
+    else:
+        save_dir = Path.home() / "Library" / "CloudStorage" / "OneDrive-Personal" / "QB_CSV_Files"
     save_dir.mkdir(parents=True, exist_ok=True)
+    return save_dir
+
+def get_scratch_dir():
+    # Local staging area, outside the synced folder
+    if config.QB_SCRATCH_DIR:
+        return Path(config.QB_SCRATCH_DIR).expanduser()
+    return Path.home() / ".quickbooks_app" / "staging"
 
+def get_csv_path(entity_type):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{entity_type.lower()}_{timestamp}.csv"
-    file_path = save_dir / filename
-    
-    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=formatted_headers)
-        writer.writeheader()
-        writer.writerows(transformed_data)
-    
-    print(f"\nData saved to: {file_path}")
-    print(f"Total records: {len(data)}")
+    return get_save_dir() / filename
+
+def export_pages(pages, entity_type, full_extract=True, projection=None):
+    """
+    Flatten, preview and save pages of records while later pages are still being fetched.
+
+    In snapshot mode only the rows that changed since the last run are
+    written; deletes are only recorded when full_extract is True, and
+    extracts of only some columns (projection) are snapshotted separately.
+    """
+    if config.QB_OUTPUT_MODE == "full":
+        output = CsvFileSink(get_csv_path(entity_type), sort_columns=True,
+                             compression=config.QB_OUTPUT_COMPRESSION, scratch_dir=get_scratch_dir())
+    else:
+        output = SnapshotSink(get_save_dir(), entity_type, detect_deletes=full_extract,
+                              compact_every=config.QB_COMPACT_EVERY, sort_columns=True,
+                              compression=config.QB_OUTPUT_COMPRESSION, scratch_dir=get_scratch_dir(),
+                              index_dir=Path.home() / ".quickbooks_app" / "snapshots", projection=projection)
+
+    sinks = [TablePreviewSink(config.QB_PREVIEW_ROWS), output] if config.QB_PREVIEW_ROWS > 0 else [output]
+    total = run_pipeline(pages, transform_records, sinks)
+    if total and config.QB_OUTPUT_MODE == "full":
+        print(f"\nData saved to: {output.path}")
+    elif total or output.counts["delete"]:
+        print(f"\nSnapshot updated in: {output.folder}")
+        print("Inserted: {insert}, updated: {update}, deleted: {delete}".format(**output.counts))
+    if total:
+        print(f"Total records: {total}")
+    return total
 
 def get_token_path():
     path = Path.home() / ".quickbooks_app"
@@ -127,12 +175,14 @@ def save_tokens(tokens):
     os.chmod(token_file, 0o600)
 
 def refresh_access_token(refresh_token):
+    import requests
+
     auth = base64.b64encode(
-        f"{QB_CLIENT_ID}:{QB_CLIENT_SECRET}".encode()
+        f"{config.QB_CLIENT_ID}:{config.QB_CLIENT_SECRET}".encode()
     ).decode()
 
     response = requests.post(
-        QB_TOKEN_URL,
+        config.QB_TOKEN_URL,
         headers={
             "Authorization": f"Basic {auth}",
             "Content-Type": "application/x-www-form-urlencoded"
@@ -160,7 +210,15 @@ def get_access_token():
 
     return tokens["access_token"]
 
-def qb_request(method, endpoint, params=None, data=None, max_retries=5):
+def qb_request(method, endpoint, params=None, data=None, max_retries=5, stream=False):
+    """
+    Send a request to the QuickBooks API, retrying on rate limits and server errors.
+
+    With stream=True the body is left unread and the response itself is
+    returned, so records can be decoded incrementally with iter_json_records.
+    """
+    import requests
+
     for attempt in range(max_retries + 1):
         token = get_access_token()
         headers = {
@@ -170,22 +228,26 @@ def qb_request(method, endpoint, params=None, data=None, max_retries=5):
         if data:
             headers["Content-Type"] = "application/json"
         
-        url = f"{QB_BASE_URL}{endpoint}"
+        url = f"{config.QB_BASE_URL}{endpoint}"
         
-        response = requests.request(method, url, headers=headers, params=params, json=data)
+        response = requests.request(method, url, headers=headers, params=params, json=data, stream=stream)
 
         if response.status_code == 429:
+            # Release the pooled connection before retrying; streamed bodies aren't read
+            response.close()
             retry_after = int(response.headers.get("Retry-After", 60))
             logger.warning(f"Rate limit hit. Waiting {retry_after}s")
             time.sleep(retry_after)
             continue
 
         if response.status_code == 401 and attempt == 0:
+            response.close()
             logger.warning("401 Unauthorized. Refreshing token...")
             refresh_access_token(load_tokens()["refresh_token"])
             continue
 
         if response.status_code in (500, 503) and attempt < max_retries:
+            response.close()
             wait = 2 ** attempt
             logger.warning(f"Server error {response.status_code}. Retrying in {wait}s")
             time.sleep(wait)
@@ -195,8 +257,12 @@ def qb_request(method, endpoint, params=None, data=None, max_retries=5):
             logger.error(f"Bad Request: {response.text}")
             raise Exception("Invalid QuickBooks request")
 
+        if not response.ok:
+            response.close()
         response.raise_for_status()
-        return response.json()
+        if stream:
+            return response
+        return decode_json(response, config.QB_JSON_DECODER)
     
     raise Exception(f"Max retries ({max_retries}) exceeded")
 
@@ -204,37 +270,58 @@ def get_api_type():
     print("\nQuickBooks API Options:")
     print("1. Run Query (SQL-like queries)")
     print("2. Complete Endpoint (Full URL path)")
+    print("3. Extract Spec (JSON file with entity, columns, filters and order)")
     
-    choice = input("Select option (1-2): ").strip()
+    choice = input("Select option (1-3): ").strip()
     return choice
 
+def iter_query_pages(method, query, page_size=1000):
+    """
+    Yield the records of a query one page at a time.
+
+    Queries without their own STARTPOSITION/MAXRESULTS are paged with them,
+    so each page can be transformed and written while the next is fetched.
+    """
+    paged = not re.search(r'\b(STARTPOSITION|MAXRESULTS)\b', query, re.IGNORECASE)
+    position = 1
+
+    while True:
+        page_query = f"{query} STARTPOSITION {position} MAXRESULTS {page_size}" if paged else query
+        response = qb_request(
+            method,
+            f"/v3/company/{config.QB_REALM_ID}/query",
+            params={"query": page_query},
+            stream=True
+        )
+        records = list(iter_json_records(response, "QueryResponse", decoder=config.QB_JSON_DECODER))
+
+        if records:
+            yield records
+        if not paged or len(records) < page_size:
+            break
+        position += page_size
+
 def handle_query_api():
     method = input("Enter HTTP method (GET/POST/PUT/DELETE): ").strip().upper()
     query = input("Enter complete SQL query: ").strip()
-    
-    response = qb_request(
-        method,
-        f"/v3/company/{QB_REALM_ID}/query",
-        params={"query": query}
-    )
+    entity, full_extract, projection = describe_query(query)
+    return iter_query_pages(method, query), entity, full_extract, projection
 
-    entity = "query_result"
-    if "FROM" in query.upper():
-        parts = query.upper().split("FROM")
-        if len(parts) > 1:
-            entity = parts[1].strip().split()[0]
-
-    records = []
-    if "QueryResponse" in response:
-        for key, value in response["QueryResponse"].items():
-            if isinstance(value, list):
-                records.extend(value)
-    
-    return records, entity
+def handle_spec_api():
+    path = input("Enter extract spec file: ").strip()
+    spec = load_extract_spec(path)
+    query = compile_query(spec)
+    logger.info(f"Compiled query: {query}")
+
+    # Filtered extracts don't see every record, so they can't detect deletes
+    full_extract = not spec.get("filters")
+    return iter_query_pages("GET", query), spec["entity"], full_extract, compile_projection(spec)
 
 def handle_custom_api():
+    # An endpoint usually returns one record or a subset, never the whole table,
+    # so its results must not mark other stored records as deleted
     endpoint = input("Enter complete endpoint: ").strip()
-    endpoint = endpoint.replace("{realm_id}", QB_REALM_ID)
+    endpoint = endpoint.replace("{realm_id}", config.QB_REALM_ID)
     
     method = input("Enter HTTP method (GET/POST/PUT/DELETE): ").strip().upper()
     
@@ -243,28 +330,33 @@ def handle_custom_api():
     if isinstance(response, dict):
         for key, value in response.items():
             if isinstance(value, list) and value:
-                return value, key
+                return value, key, False
             elif isinstance(value, dict):
-                return [value], key
+                return [value], key, False
     
-    return [response], "custom"
+    return [response], "custom", False
 
 
 def main():
     try:
         api_type = get_api_type()
         
+        if api_type in ("1", "2", "3"):
+            config.validate_config()
+
+        projection = None
         if api_type == "1":
-            data, entity_name = handle_query_api()
+            pages, entity_name, full_extract, projection = handle_query_api()
         elif api_type == "2":
-            data, entity_name = handle_custom_api()
+            data, entity_name, full_extract = handle_custom_api()
+            pages = [data] if data else []
+        elif api_type == "3":
+            pages, entity_name, full_extract, projection = handle_spec_api()
         else:
             print("Invalid choice")
             return
 
-        if data:
-            display_table_and_save_csv(data, entity_name)
-        else:
+        if not export_pages(pages, entity_name, full_extract, projection):
             print("No data found")
         
     except Exception as e:
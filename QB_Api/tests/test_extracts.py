@@ -0,0 +1,65 @@
+import json
+import pytest
+from extracts import compile_query, compile_projection, describe_query, load_extract_spec
+
+class TestCompileQuery:
+    def test_entity_only(self):
+        assert compile_query({"entity": "Customer"}) == "SELECT * FROM Customer"
+
+    def test_columns_always_include_id(self):
+        spec = {"entity": "Customer", "columns": ["DisplayName", "Balance"]}
+        assert compile_query(spec) == "SELECT Id, DisplayName, Balance FROM Customer"
+
+    def test_filters_and_order(self):
+        spec = {
+            "entity": "Invoice",
+            "columns": ["Id", "TotalAmt"],
+            "filters": [
+                {"column": "Balance", "op": ">", "value": 0},
+                {"column": "CustomerRef", "op": "in", "value": ["1", "2"]},
+                {"column": "DocNumber", "op": "LIKE", "value": "O'B%"},
+                {"column": "Active", "value": True}
+            ],
+            "order": ["TxnDate DESC"]
+        }
+        assert compile_query(spec) == (
+            "SELECT Id, TotalAmt FROM Invoice "
+            "WHERE Balance > 0 AND CustomerRef IN ('1', '2') AND DocNumber LIKE 'O\\'B%' AND Active = true "
+            "ORDERBY TxnDate DESC"
+        )
+
+    def test_unsupported_operator(self):
+        with pytest.raises(ValueError):
+            compile_query({"entity": "Customer", "filters": [{"column": "Balance", "op": "!=", "value": 0}]})
+
+class TestCompileProjection:
+    def test_full_select(self):
+        assert compile_projection({"entity": "Customer"}) is None
+
+    def test_columns_include_id(self):
+        spec = {"entity": "Customer", "columns": ["DisplayName", "Balance"]}
+        assert compile_projection(spec) == ["Balance", "DisplayName", "Id"]
+
+class TestDescribeQuery:
+    def test_select_all_is_full_extract(self):
+        assert describe_query("SELECT * FROM Customer ORDERBY Id") == ("Customer", True, None)
+
+    def test_filtered_or_paged_is_not_full(self):
+        assert describe_query("select * from Invoice where Balance > '0'") == ("Invoice", False, None)
+        assert describe_query("SELECT * FROM Invoice MAXRESULTS 10") == ("Invoice", False, None)
+
+    def test_select_list_gets_a_projection(self):
+        assert describe_query("SELECT Id, DisplayName FROM Customer") == ("Customer", False, ["DisplayName", "Id"])
+
+    def test_aggregate_never_detects_deletes(self):
+        assert describe_query("SELECT COUNT(*) FROM Customer") == ("Customer", False, ["COUNT(*)"])
+
+    def test_unparsed_query(self):
+        assert describe_query("DELETE Customer") == ("query_result", False, None)
+
+class TestLoadExtractSpec:
+    def test_entity_required(self, tmp_path):
+        path = tmp_path / "spec.json"
+        path.write_text(json.dumps({"columns": ["Id"]}))
+        with pytest.raises(ValueError):
+            load_extract_spec(path)
@@ -0,0 +1,23 @@
+from unittest.mock import patch
+from main import handle_custom_api, handle_query_api
+
+class TestHandleCustomApi:
+    def test_single_record_is_not_a_full_extract(self):
+        response = {"Customer": {"Id": "5", "DisplayName": "A"}, "time": "2026-01-14T00:00:00Z"}
+        with patch("builtins.input", side_effect=["/v3/company/{realm_id}/customer/5", "GET"]), \
+                patch("main.qb_request", return_value=response), patch("config.QB_REALM_ID", "123"):
+            records, entity, full_extract = handle_custom_api()
+
+        assert records == [{"Id": "5", "DisplayName": "A"}]
+        assert entity == "Customer"
+        assert full_extract is False
+
+class TestHandleQueryApi:
+    def test_select_list_keeps_its_own_snapshot(self):
+        with patch("builtins.input", side_effect=["GET", "SELECT Id, DisplayName FROM Customer"]), \
+                patch("main.iter_query_pages", return_value=iter([])):
+            _, entity, full_extract, projection = handle_query_api()
+
+        assert entity == "Customer"
+        assert full_extract is False
+        assert projection == ["DisplayName", "Id"]
@@ -0,0 +1,30 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+pytest.importorskip("requests")
+import main
+from main import qb_request
+
+def fake_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.ok = status_code < 400
+    return response
+
+class TestRetriesReleaseConnections:
+    @pytest.mark.parametrize("status_code", [429, 401, 503])
+    def test_retried_response_is_closed(self, status_code):
+        retried = fake_response(status_code, {"Retry-After": "0"})
+        success = fake_response(200)
+
+        with patch("requests.request", side_effect=[retried, success]), \
+                patch("main.get_access_token", return_value="test_token"), \
+                patch("main.refresh_access_token"), \
+                patch("main.load_tokens", return_value={"refresh_token": "r"}), \
+                patch("main.time.sleep"):
+            result = qb_request("GET", "/test", stream=True)
+
+        assert result is success
+        retried.close.assert_called_once()
+        success.close.assert_not_called()
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+HEAVY_MODULES = ("pandas", "pyarrow", "tabulate", "requests")
+
+def loaded_heavy_modules(folder, module, extra=()):
+    names = HEAVY_MODULES + tuple(extra)
+    code = f"import sys, {module}; print(','.join(m for m in {names!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=folder, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+class TestStartup:
+    def test_quickbooks_heavy_modules_not_imported(self):
+        # .env is only read once an API has been picked
+        assert loaded_heavy_modules(ROOT / "QB_Api", "main", extra=("dotenv",)) == ""
+
+    def test_xero_heavy_modules_not_imported(self):
+        pytest.importorskip("dotenv")
+        assert loaded_heavy_modules(ROOT / "xero_etl", "xeroEtlApi") == ""
@@ -0,0 +1,106 @@
+import importlib
+
+DECODERS = ("auto", "stream", "fast", "standard")
+
+
+def _optional(name):
+    # Decoder libraries are only imported once a response needs decoding
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def resolve_decoder(decoder="auto"):
+    """
+    Pick the JSON decoder to use for API responses.
+
+    "stream" parses the body incrementally with ijson, "fast" decodes it in one
+    go with orjson and "standard" uses the json module. "auto" picks the first
+    one that is installed, in that order.
+    """
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder '{decoder}'. Expected one of: {', '.join(DECODERS)}")
+    if decoder == "auto":
+        if _optional("ijson") is not None:
+            return "stream"
+        return "fast" if _optional("orjson") is not None else "standard"
+    if decoder == "stream" and _optional("ijson") is None:
+        raise ImportError("The 'stream' JSON decoder requires ijson: pip install ijson")
+    if decoder == "fast" and _optional("orjson") is None:
+        raise ImportError("The 'fast' JSON decoder requires orjson: pip install orjson")
+    return decoder
+
+
+def decode_json(response, decoder="auto"):
+    """Decode a whole response body, using orjson when it is available."""
+    orjson = _optional("orjson")
+    if resolve_decoder(decoder) != "standard" and orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def iter_json_records(response, parent="", key=None, decoder="auto"):
+    """
+    Yield the elements of the arrays found directly under ``parent``.
+
+    With the "stream" decoder the body is read from the socket and each record
+    is built as soon as its closing bracket is parsed, so the raw body, the
+    decoded text and the full object tree never have to be held at once. The
+    other decoders decode the whole body and then walk it.
+
+    Args:
+        response: requests.Response, ideally requested with stream=True
+        parent: Dotted path of the object holding the arrays, "" for the top level
+        key: Only read the array under this key, or None for every array
+        decoder: One of DECODERS
+
+    Yields:
+        Records from the matching arrays, in document order
+    """
+    try:
+        if resolve_decoder(decoder) == "stream":
+            response.raw.decode_content = True
+            ijson = _optional("ijson")
+            yield from _iter_stream_records(ijson.parse(response.raw, use_float=True), ijson, parent, key)
+            return
+
+        data = decode_json(response, decoder)
+        for part in parent.split(".") if parent else []:
+            data = data.get(part, {}) if isinstance(data, dict) else {}
+        if not isinstance(data, dict):
+            return
+        for k, value in data.items():
+            if isinstance(value, list) and (key is None or k == key):
+                yield from value
+    finally:
+        response.close()
+
+
+def _iter_stream_records(events, ijson, parent, key):
+    depth = parent.count(".") + 2 if parent else 1
+    builder = None
+    item_prefix = None
+
+    for prefix, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item_prefix and event in ("end_map", "end_array"):
+                yield builder.value
+                builder = None
+            continue
+
+        if not prefix.endswith(".item"):
+            continue
+        path = prefix[:-len(".item")]
+        if path.count(".") != depth - 1 or (parent and not path.startswith(parent + ".")):
+            continue
+        if key is not None and path.rsplit(".", 1)[-1] != key:
+            continue
+
+        if event in ("start_map", "start_array"):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            item_prefix = prefix
+        elif event not in ("end_map", "end_array", "map_key"):
+            yield value
@@ -0,0 +1,160 @@
+import csv
+import queue
+import tempfile
+import threading
+from pathlib import Path
+
+from .staging import output_path, staged_file
+
+# Marks the end of a stream of batches between two stages
+_DONE = object()
+# Returned to a stage when another stage has failed and the run is stopping
+_STOPPED = object()
+
+
+def run_pipeline(pages, transform, sinks, maxsize=4):
+    """
+    Stream batches of records from a fetcher through a transform into sinks.
+
+    Fetching, transforming and writing each run on their own worker thread and
+    are linked by bounded queues, so the next page is requested while the
+    previous one is still being flattened and written. When a later stage
+    falls behind the queues fill up and the fetcher blocks (backpressure)
+    instead of buffering the whole extract in memory.
+
+    Args:
+        pages: Iterable yielding lists of records, typically one per API page
+        transform: Callable applied to each batch, or None to pass it through
+        sinks: Objects with write(batch) and close() methods
+        maxsize: Maximum number of batches waiting between two stages
+
+    Returns:
+        Number of records delivered to the sinks
+    """
+    raw = queue.Queue(maxsize)
+    ready = queue.Queue(maxsize)
+    stop = threading.Event()
+    errors = []
+    delivered = [0]
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _STOPPED
+
+    def fetch():
+        for page in pages:
+            if not put(raw, page):
+                return
+        put(raw, _DONE)
+
+    def convert():
+        while True:
+            page = get(raw)
+            if page is _STOPPED:
+                return
+            if page is _DONE:
+                put(ready, _DONE)
+                return
+            if not put(ready, transform(page) if transform else page):
+                return
+
+    def write():
+        while True:
+            batch = get(ready)
+            if batch is _DONE or batch is _STOPPED:
+                return
+            for sink in sinks:
+                sink.write(batch)
+            delivered[0] += len(batch)
+
+    def guarded(stage):
+        def run():
+            try:
+                stage()
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+        return run
+
+    workers = [
+        threading.Thread(target=guarded(stage), name=f"pipeline-{stage.__name__}", daemon=True)
+        for stage in (fetch, convert, write)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    if errors:
+        raise errors[0]
+
+    for sink in sinks:
+        sink.close()
+    return delivered[0]
+
+
+class CsvFileSink:
+    """
+    Pipeline sink that writes records to a CSV file as batches arrive.
+
+    The full set of columns is only known once the last page has been seen,
+    so rows are spooled to a temporary file and the header is written on close.
+    The finished file is staged locally, optionally compressed, and published
+    to path (plus the compression suffix) in one rename. No file is created
+    when no records were written.
+    """
+
+    def __init__(self, path, sort_columns=False, compression="none", scratch_dir=None):
+        self.path = output_path(path, compression)
+        self.sort_columns = sort_columns
+        self.compression = compression
+        self.scratch_dir = scratch_dir
+        self.columns = {}
+        self.rows = 0
+        if scratch_dir:
+            Path(scratch_dir).mkdir(parents=True, exist_ok=True)
+        self._spool = tempfile.TemporaryFile("w+", newline="", encoding="utf-8", dir=scratch_dir)
+        self._writer = csv.writer(self._spool)
+
+    def write(self, records):
+        for record in records:
+            for key in record:
+                if key not in self.columns:
+                    self.columns[key] = len(self.columns)
+            row = [""] * len(self.columns)
+            for key, value in record.items():
+                row[self.columns[key]] = "" if value is None else value
+            self._writer.writerow(row)
+        self.rows += len(records)
+
+    def close(self):
+        if not self.rows:
+            self._spool.close()
+            return
+
+        header = sorted(self.columns) if self.sort_columns else list(self.columns)
+        order = [self.columns[name] for name in header]
+        width = len(self.columns)
+
+        self._spool.seek(0)
+        with staged_file(self.path, self.compression, self.scratch_dir) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            for row in csv.reader(self._spool):
+                # Rows spooled before a column first appeared are shorter
+                row.extend([""] * (width - len(row)))
+                writer.writerow([row[i] for i in order])
+        self._spool.close()
@@ -0,0 +1,181 @@
+import csv
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .pipeline import CsvFileSink
+from .staging import open_output, output_path, staged_file
+
+OP_COLUMN = "_op"
+
+
+def row_hash(record):
+    """Hash a record by the values it would have in a CSV file."""
+    canonical = json.dumps(
+        [[k, "" if v is None else str(v)] for k, v in sorted(record.items())],
+        separators=(",", ":")
+    )
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def guess_key(record, entity):
+    """Find the record ID column, e.g. Id for QuickBooks or InvoiceID for Xero Invoices."""
+    if entity.lower().endswith("ies"):
+        singular = entity[:-3] + "y"
+    else:
+        singular = entity[:-1] if entity.lower().endswith("s") else entity
+    for candidate in ("Id", "ID", f"{singular}ID", f"{singular}_ID", f"{singular}Id"):
+        if candidate in record:
+            return candidate
+    for column in record:
+        if column.endswith(("ID", "Id")):
+            return column
+    raise ValueError(f"Could not find an ID column for {entity}. Pass key explicitly or use the full output mode.")
+
+
+def snapshot_name(entity, projection=None):
+    """Folder name for an entity's snapshot; each projection gets its own folder."""
+    if not projection:
+        return entity.lower()
+    canonical = json.dumps(projection, sort_keys=True, separators=(",", ":"))
+    return f"{entity.lower()}_{hashlib.blake2b(canonical.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+class SnapshotSink:
+    """
+    Pipeline sink that keeps a compacted, change-tracked copy of an entity.
+
+    Each entity gets its own folder holding a base snapshot (base.csv) and
+    delta files, plus an index of record ID to row hash (index.json). A run
+    only writes the rows that were inserted, updated or deleted since the last
+    run to delta_<timestamp>.csv, with the change in the _op column. Once
+    compact_every deltas have built up they are merged into base.csv. Every
+    file is published through the staging area, so base.csv and the deltas
+    carry the compression suffix when compression is enabled.
+
+    Deletes can only be detected when the run fetched the whole table, so
+    pass detect_deletes=False for filtered extracts.
+
+    Extracts that only fetch some columns (a projection) hash differently
+    from full rows, so they are kept in their own <entity>_<hash> folder
+    rather than overwriting the full snapshot.
+
+    The index holds every record ID and is rewritten on each run, so when root
+    is a synced folder pass index_dir to keep it on local disk instead.
+    """
+
+    def __init__(self, root, entity, key=None, detect_deletes=True, compact_every=10, sort_columns=False,
+                 compression="none", scratch_dir=None, index_dir=None, projection=None):
+        self.folder = Path(root) / snapshot_name(entity, projection)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.entity = entity
+        self.key = key
+        self.detect_deletes = detect_deletes
+        self.compact_every = compact_every
+        self.sort_columns = sort_columns
+        self.compression = compression
+        self.scratch_dir = scratch_dir
+
+        if index_dir:
+            # One index per snapshot folder, even when several output roots are used
+            folder_id = hashlib.blake2b(str(self.folder.resolve()).encode("utf-8"), digest_size=4).hexdigest()
+            self.index_path = Path(index_dir) / f"{self.folder.name}_{folder_id}.json"
+        else:
+            self.index_path = self.folder / "index.json"
+        self.base_path = output_path(self.folder / "base.csv", compression)
+        self.previous = {}
+        if self.index_path.exists():
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            self.key = self.key or index["key"]
+            self.previous = index["rows"]
+        self.seen = {}
+        self.counts = {"insert": 0, "update": 0, "delete": 0}
+
+        self.delta = CsvFileSink(self._new_delta_path(), compression=compression, scratch_dir=scratch_dir)
+
+    def _new_delta_path(self):
+        # Runs can start within the same second, so the name carries microseconds
+        # and a counter; an existing delta is never overwritten
+        stem = f"delta_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        path = self.folder / f"{stem}.csv"
+        counter = 0
+        while any(self.folder.glob(f"{path.name}*")):
+            counter += 1
+            path = self.folder / f"{stem}_{counter}.csv"
+        return path
+
+    def write(self, records):
+        changes = []
+        for record in records:
+            if self.key is None:
+                self.key = guess_key(record, self.entity)
+            if self.key not in record:
+                raise ValueError(f"Record without {self.key} in {self.entity}")
+
+            record_id = str(record[self.key])
+            digest = row_hash(record)
+            self.seen[record_id] = digest
+
+            previous = self.previous.get(record_id)
+            if previous == digest:
+                continue
+            op = "insert" if previous is None else "update"
+            self.counts[op] += 1
+            changes.append({OP_COLUMN: op, **record})
+        self.delta.write(changes)
+
+    def close(self):
+        if self.detect_deletes:
+            deleted = [record_id for record_id in self.previous if record_id not in self.seen]
+            self.counts["delete"] = len(deleted)
+            self.delta.write([{OP_COLUMN: "delete", self.key: record_id} for record_id in deleted])
+            rows = self.seen
+        else:
+            rows = {**self.previous, **self.seen}
+        self.delta.close()
+        if self.key is None:
+            # Nothing fetched and nothing stored yet
+            return
+
+        with staged_file(self.index_path, scratch_dir=self.scratch_dir) as f:
+            json.dump({"key": self.key, "rows": rows}, f)
+
+        deltas = sorted(self.folder.glob("delta_*.csv*"))
+        if deltas and (not self._bases() or len(deltas) >= self.compact_every):
+            self.compact()
+
+    def _bases(self):
+        # A base written before the compression setting changed has another suffix
+        return sorted(self.folder.glob("base.csv*"))
+
+    def compact(self):
+        """Merge all delta files into base.csv and remove them."""
+        deltas = sorted(self.folder.glob("delta_*.csv*"))
+        bases = self._bases()
+        rows = {}
+        key = self.key
+
+        for base_path in bases[:1]:
+            with open_output(base_path) as f:
+                for row in csv.DictReader(f):
+                    rows[row[key]] = row
+
+        for delta_path in deltas:
+            with open_output(delta_path) as f:
+                for row in csv.DictReader(f):
+                    op = row.pop(OP_COLUMN)
+                    if op == "delete":
+                        rows.pop(row[key], None)
+                    else:
+                        rows[row[key]] = row
+
+        base = CsvFileSink(self.folder / "base.csv", sort_columns=self.sort_columns,
+                           compression=self.compression, scratch_dir=self.scratch_dir)
+        base.write(list(rows.values()))
+        base.close()
+
+        for path in bases + deltas:
+            if path != self.base_path or not rows:
+                path.unlink()
@@ -0,0 +1,123 @@
+import errno
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# File suffix added for each output compression
+COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def output_path(path, compression="none"):
+    """Path a file is published under once compressed, e.g. contacts.csv.gz."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'. Expected one of: {', '.join(COMPRESSIONS)}")
+    return Path(f"{path}{COMPRESSIONS[compression]}")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires zstandard: pip install zstandard")
+    return zstandard
+
+
+@contextmanager
+def staged_file(path, compression="none", scratch_dir=None):
+    """
+    Write a text file in a local scratch directory and publish it when complete.
+
+    The file is written (and optionally compressed while streaming) under
+    scratch_dir, fsynced and then moved to path with an atomic rename, so a
+    sync client watching the destination folder only ever sees the finished
+    file. Nothing is published if the block raises.
+
+    Args:
+        path: Final location of the file, including any compression suffix
+        compression: One of COMPRESSIONS
+        scratch_dir: Local directory for the partial file, defaults to the system temp dir
+
+    Yields:
+        Text file object opened with newline="" for use with the csv module
+    """
+    path = Path(path)
+    output_path(path, compression)
+    scratch = Path(scratch_dir) if scratch_dir else Path(tempfile.gettempdir())
+    scratch.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".partial", dir=scratch)
+    raw = os.fdopen(fd, "wb")
+    text = None
+    try:
+        if compression == "gzip":
+            binary = gzip.GzipFile(filename=path.name, mode="wb", fileobj=raw)
+        elif compression == "zstd":
+            binary = _zstandard().ZstdCompressor().stream_writer(raw, closefd=False)
+        else:
+            binary = raw
+
+        text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        yield text
+
+        text.flush()
+        text.detach()
+        if binary is not raw:
+            # Writes the compression trailer without closing raw
+            binary.close()
+        raw.flush()
+        os.fsync(raw.fileno())
+        raw.close()
+        _publish(tmp_name, path)
+    except BaseException:
+        if text is not None:
+            try:
+                text.close()
+            except ValueError:
+                # Already detached after a successful write
+                pass
+        raw.close()
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _publish(tmp_name, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(tmp_name, path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Scratch is on another volume: copy next to the target so the final rename stays atomic
+        partial = path.with_name(f".{path.name}.partial")
+        shutil.copyfile(tmp_name, partial)
+        with open(partial, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(partial, path)
+        os.unlink(tmp_name)
+
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def open_output(path):
+    """Open a published file for reading as text, decompressing by its suffix."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.suffix == ".zst":
+        reader = _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return open(path, newline="", encoding="utf-8")
@@ -0,0 +1,56 @@
+import io
+import json
+import pytest
+from etl_common.decoding import iter_json_records, resolve_decoder
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+        self.raw = io.BytesIO(self.content)
+        self.closed = False
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        self.closed = True
+
+PAYLOAD = {
+    "QueryResponse": {
+        "Customer": [
+            {"Id": "1", "BillAddr": {"City": "NYC"}, "Tags": [1, 2]},
+            {"Id": "2", "Line": [{"Amount": 1.5}]}
+        ],
+        "startPosition": 1,
+        "maxResults": 2
+    },
+    "time": "2026-01-14T00:00:00Z"
+}
+
+class TestIterJsonRecords:
+    @pytest.mark.parametrize("decoder", ["standard", "fast", "stream"])
+    def test_records_under_parent(self, decoder):
+        if decoder == "stream":
+            pytest.importorskip("ijson")
+        if decoder == "fast":
+            pytest.importorskip("orjson")
+        response = FakeResponse(PAYLOAD)
+        records = list(iter_json_records(response, "QueryResponse", decoder=decoder))
+        assert records == PAYLOAD["QueryResponse"]["Customer"]
+        assert response.closed
+
+    @pytest.mark.parametrize("decoder", ["standard", "stream"])
+    def test_top_level_key(self, decoder):
+        if decoder == "stream":
+            pytest.importorskip("ijson")
+        payload = {"Id": "x", "Journals": [{"JournalNumber": 1}], "Warnings": [{"Message": "m"}]}
+        records = list(iter_json_records(FakeResponse(payload), key="Journals", decoder=decoder))
+        assert records == [{"JournalNumber": 1}]
+
+    def test_missing_parent_yields_nothing(self):
+        response = FakeResponse({"Fault": {"Error": []}})
+        assert list(iter_json_records(response, "QueryResponse", decoder="standard")) == []
+
+    def test_unknown_decoder(self):
+        with pytest.raises(ValueError):
+            resolve_decoder("simdjson")
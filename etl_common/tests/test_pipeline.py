@@ -0,0 +1,70 @@
+import csv
+import pytest
+from etl_common.pipeline import run_pipeline, CsvFileSink
+
+class ListSink:
+    def __init__(self):
+        self.records = []
+        self.closed = False
+
+    def write(self, records):
+        self.records.extend(records)
+
+    def close(self):
+        self.closed = True
+
+class TestRunPipeline:
+    def test_pages_are_transformed_in_order(self):
+        pages = [[{"Id": 1}, {"Id": 2}], [{"Id": 3}]]
+        sink = ListSink()
+        total = run_pipeline(pages, lambda page: [{"Id": r["Id"] * 10} for r in page], [sink], maxsize=1)
+        assert total == 3
+        assert sink.records == [{"Id": 10}, {"Id": 20}, {"Id": 30}]
+        assert sink.closed
+
+    def test_no_transform_passes_pages_through(self):
+        sink = ListSink()
+        run_pipeline(iter([[{"Id": 1}]]), None, [sink])
+        assert sink.records == [{"Id": 1}]
+
+    def test_fetch_error_is_raised_and_sinks_not_closed(self):
+        def pages():
+            yield [{"Id": 1}]
+            raise RuntimeError("fetch failed")
+
+        sink = ListSink()
+        with pytest.raises(RuntimeError, match="fetch failed"):
+            run_pipeline(pages(), None, [sink])
+        assert not sink.closed
+
+    def test_sink_error_stops_fetcher(self):
+        fetched = []
+
+        def pages():
+            for i in range(1000):
+                fetched.append(i)
+                yield [{"Id": i}]
+
+        class FailingSink(ListSink):
+            def write(self, records):
+                raise ValueError("disk full")
+
+        with pytest.raises(ValueError, match="disk full"):
+            run_pipeline(pages(), None, [FailingSink()], maxsize=1)
+        assert len(fetched) < 1000
+
+class TestCsvFileSink:
+    def test_columns_added_by_later_pages(self, tmp_path):
+        sink = CsvFileSink(tmp_path / "out.csv", sort_columns=True)
+        sink.write([{"Name": "A", "Id": 1}])
+        sink.write([{"Id": 2, "Balance": None, "Name": "B"}])
+        sink.close()
+
+        with open(tmp_path / "out.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows == [["Balance", "Id", "Name"], ["", "1", "A"], ["", "2", "B"]]
+
+    def test_no_file_without_records(self, tmp_path):
+        sink = CsvFileSink(tmp_path / "out.csv")
+        sink.close()
+        assert not (tmp_path / "out.csv").exists()
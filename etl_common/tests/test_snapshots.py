@@ -0,0 +1,109 @@
+import csv
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from etl_common.snapshots import SnapshotSink, guess_key, row_hash, snapshot_name
+from etl_common.staging import open_output
+
+def run(root, records, **kwargs):
+    sink = SnapshotSink(root, "Customer", **kwargs)
+    sink.write(records)
+    sink.close()
+    return sink
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+class TestSnapshotSink:
+    def test_first_run_writes_base_snapshot(self, tmp_path):
+        sink = run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}])
+        assert sink.counts == {"insert": 2, "update": 0, "delete": 0}
+        assert read_csv(tmp_path / "customer" / "base.csv") == [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}]
+        assert not list((tmp_path / "customer").glob("delta_*.csv"))
+
+    def test_later_run_writes_only_changes(self, tmp_path):
+        run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}, {"Id": "3", "Name": "C"}])
+        sink = run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B2"}, {"Id": "4", "Name": "D"}])
+        assert sink.counts == {"insert": 1, "update": 1, "delete": 1}
+
+        deltas = list((tmp_path / "customer").glob("delta_*.csv"))
+        assert len(deltas) == 1
+        assert read_csv(deltas[0]) == [
+            {"_op": "update", "Id": "2", "Name": "B2"},
+            {"_op": "insert", "Id": "4", "Name": "D"},
+            {"_op": "delete", "Id": "3", "Name": ""},
+        ]
+
+    def test_unchanged_run_writes_no_delta(self, tmp_path):
+        run(tmp_path, [{"Id": "1", "Name": "A"}])
+        run(tmp_path, [{"Id": "1", "Name": "A"}])
+        assert not list((tmp_path / "customer").glob("delta_*.csv"))
+
+    def test_compaction_merges_deltas_into_base(self, tmp_path):
+        run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}])
+        run(tmp_path, [{"Id": "1", "Name": "A1"}, {"Id": "3", "Name": "C"}], compact_every=1)
+        assert read_csv(tmp_path / "customer" / "base.csv") == [{"Id": "1", "Name": "A1"}, {"Id": "3", "Name": "C"}]
+        assert not list((tmp_path / "customer").glob("delta_*.csv"))
+
+    def test_filtered_run_keeps_unseen_records(self, tmp_path):
+        run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}])
+        sink = run(tmp_path, [{"Id": "2", "Name": "B"}], detect_deletes=False)
+        assert sink.counts["delete"] == 0
+        index = json.loads((tmp_path / "customer" / "index.json").read_text())
+        assert set(index["rows"]) == {"1", "2"}
+
+    def test_runs_in_the_same_second_keep_their_deltas(self, tmp_path):
+        run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}, {"Id": "3", "Name": "C"}])
+        with patch("etl_common.snapshots.datetime") as fake_datetime:
+            fake_datetime.now.return_value = datetime(2026, 1, 14, 12, 0, 0, 0)
+            run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}])
+            run(tmp_path, [{"Id": "1", "Name": "A"}])
+
+        deltas = sorted((tmp_path / "customer").glob("delta_*.csv"))
+        assert [row["_op"] + row["Id"] for path in deltas for row in read_csv(path)] == ["delete3", "delete2"]
+
+    def test_index_kept_outside_the_output_folder(self, tmp_path):
+        index_dir = tmp_path / "app"
+        run(tmp_path / "out", [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}], index_dir=index_dir)
+        sink = run(tmp_path / "out", [{"Id": "1", "Name": "A"}], index_dir=index_dir)
+
+        assert sink.counts == {"insert": 0, "update": 0, "delete": 1}
+        assert sorted(p.name for p in (tmp_path / "out" / "customer").iterdir())[0] == "base.csv"
+        assert not (tmp_path / "out" / "customer" / "index.json").exists()
+        assert [p.name.startswith("customer_") for p in index_dir.iterdir()] == [True]
+
+    def test_projected_run_keeps_full_snapshot(self, tmp_path):
+        full = [{"Id": "1", "Name": "A", "Balance": "10"}, {"Id": "2", "Name": "B", "Balance": "20"}]
+        run(tmp_path, full)
+        sink = run(tmp_path, [{"Id": "1", "Name": "A"}, {"Id": "2", "Name": "B"}],
+                   projection=["Id", "Name"], compact_every=1)
+
+        assert sink.folder.name == snapshot_name("Customer", ["Id", "Name"])
+        assert sink.folder.name.startswith("customer_")
+        assert sink.counts == {"insert": 2, "update": 0, "delete": 0}
+        assert read_csv(tmp_path / "customer" / "base.csv") == full
+
+        again = run(tmp_path, full)
+        assert again.counts == {"insert": 0, "update": 0, "delete": 0}
+
+    def test_compressed_snapshot(self, tmp_path):
+        run(tmp_path, [{"Id": "1", "Name": "A"}], compression="gzip", scratch_dir=tmp_path / "scratch")
+        run(tmp_path, [{"Id": "2", "Name": "B"}], compression="gzip", scratch_dir=tmp_path / "scratch", compact_every=1)
+        folder = tmp_path / "customer"
+        assert sorted(p.name for p in folder.iterdir()) == ["base.csv.gz", "index.json"]
+        with open_output(folder / "base.csv.gz") as f:
+            assert list(csv.DictReader(f)) == [{"Id": "2", "Name": "B"}]
+
+class TestHelpers:
+    def test_row_hash_ignores_key_order_and_none(self):
+        assert row_hash({"Id": "1", "Name": None}) == row_hash({"Name": "", "Id": "1"})
+        assert row_hash({"Id": "1", "Name": "A"}) != row_hash({"Id": "1", "Name": "B"})
+
+    def test_guess_key(self):
+        assert guess_key({"Name": "A", "Id": "1"}, "Customer") == "Id"
+        assert guess_key({"InvoiceNumber": "1", "InvoiceID": "x"}, "Invoices") == "InvoiceID"
+        assert guess_key({"TrackingOptionID": "o", "TrackingCategoryID": "t"}, "TrackingCategories") == "TrackingCategoryID"
+        with pytest.raises(ValueError):
+            guess_key({"Name": "A"}, "Customer")
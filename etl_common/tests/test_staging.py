@@ -0,0 +1,45 @@
+import gzip
+import pytest
+from etl_common.staging import staged_file, open_output, output_path
+
+class TestStagedFile:
+    def test_published_only_when_complete(self, tmp_path):
+        target = tmp_path / "out" / "data.csv"
+        scratch = tmp_path / "scratch"
+        with staged_file(target, scratch_dir=scratch) as f:
+            f.write("Id,Name\r\n")
+            assert not target.exists()
+            assert len(list(scratch.iterdir())) == 1
+        assert target.read_text() == "Id,Name\n"
+        assert not list(scratch.iterdir())
+
+    def test_nothing_published_on_error(self, tmp_path):
+        target = tmp_path / "data.csv"
+        scratch = tmp_path / "scratch"
+        with pytest.raises(RuntimeError):
+            with staged_file(target, scratch_dir=scratch) as f:
+                f.write("partial")
+                raise RuntimeError("boom")
+        assert not target.exists()
+        assert not list(scratch.iterdir())
+
+    def test_gzip_round_trip(self, tmp_path):
+        target = output_path(tmp_path / "data.csv", "gzip")
+        assert target.name == "data.csv.gz"
+        with staged_file(target, "gzip", scratch_dir=tmp_path / "scratch") as f:
+            f.write("Id,Name\r\n1,A\r\n")
+        assert gzip.decompress(target.read_bytes()) == b"Id,Name\r\n1,A\r\n"
+        with open_output(target) as f:
+            assert f.read() == "Id,Name\r\n1,A\r\n"
+
+    def test_zstd_round_trip(self, tmp_path):
+        pytest.importorskip("zstandard")
+        target = output_path(tmp_path / "data.csv", "zstd")
+        with staged_file(target, "zstd", scratch_dir=tmp_path / "scratch") as f:
+            f.write("Id\r\n1\r\n")
+        with open_output(target) as f:
+            assert f.read() == "Id\r\n1\r\n"
+
+    def test_unknown_compression(self, tmp_path):
+        with pytest.raises(ValueError):
+            output_path(tmp_path / "data.csv", "bz2")
@@ -0,0 +1,103 @@
+"""
+Startup benchmark for the ETL entry points.
+
+Times how long each script takes to import (the point where it is ready to
+show its first prompt), prints an import-time report of the slowest imports
+and fails when a run goes over the startup budget or loads a heavy dependency
+that should only be imported by the sink that needs it. The budget applies to
+the time on top of starting a bare interpreter, so it holds across machines.
+
+Usage:
+    python startup_benchmark.py [--runs 10] [--budget-ms 50] [--top 10]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# (name, folder the script runs from, module to import)
+ENTRY_POINTS = [
+    ("QuickBooks", ROOT / "QB_Api", "main"),
+    ("Xero", ROOT / "xero_etl", "xeroEtlApi"),
+]
+
+# Dependencies that must only be loaded when a sink uses them
+HEAVY_MODULES = ("pandas", "pyarrow", "tabulate", "requests")
+
+
+def time_import(folder, module, runs):
+    """Wall-clock milliseconds of a fresh interpreter importing module, once per run."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=folder, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def import_report(folder, module, top):
+    """Slowest imports made directly by module, from python -X importtime, as (cumulative_ms, name)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=folder,
+                            check=True, capture_output=True, text=True)
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level and listed before their parent
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative) / 1000, name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                return sorted(children, reverse=True)[:top]
+            children = []
+    return []
+
+
+def loaded_heavy_modules(folder, module):
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=folder, check=True,
+                            capture_output=True, text=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreter starts per entry point")
+    parser.add_argument("--budget-ms", type=float, default=50,
+                        help="maximum median startup time over the bare interpreter")
+    parser.add_argument("--top", type=int, default=10, help="imports listed in the report")
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_import(ROOT, "sys", args.runs))
+    print(f"Bare interpreter: {baseline:.1f} ms")
+
+    failures = []
+    for name, folder, module in ENTRY_POINTS:
+        overhead = statistics.median(time_import(folder, module, args.runs)) - baseline
+        print(f"\n{name} ({folder.name}/{module}.py): {overhead:.1f} ms over the bare interpreter, "
+              f"budget {args.budget_ms:.0f} ms")
+        for cumulative, imported in import_report(folder, module, args.top):
+            print(f"  {cumulative:8.1f} ms  {imported}")
+
+        heavy = loaded_heavy_modules(folder, module)
+        if heavy:
+            failures.append(f"{name} imports {', '.join(heavy)} at startup")
+        if overhead > args.budget_ms:
+            failures.append(f"{name} startup {overhead:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nStartup within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,24 @@ XERO_REFRESH_TOKEN = os.getenv("XERO_REFRESH_TOKEN")
 XERO_TENANT_ID = os.getenv("XERO_TENANT_ID")
 XERO_BASE_URL = os.getenv("XERO_BASE_URL")
 
+# Response decoding: auto, stream (ijson), fast (orjson) or standard
+XERO_JSON_DECODER = os.getenv("XERO_JSON_DECODER", "auto")
+
+# Output: snapshot (per-endpoint base + delta files) or full (timestamped CSV per run)
+XERO_OUTPUT_MODE = os.getenv("XERO_OUTPUT_MODE", "snapshot")
+# Where exports are published (defaults to the OneDrive Xero_Data folder),
+# how they are compressed (none, gzip or zstd) and where they are staged first
+XERO_OUTPUT_ROOT = os.getenv("XERO_OUTPUT_ROOT")
+XERO_OUTPUT_COMPRESSION = os.getenv("XERO_OUTPUT_COMPRESSION", "none")
+XERO_SCRATCH_DIR = os.getenv("XERO_SCRATCH_DIR")
+try:
+    XERO_COMPACT_EVERY = int(os.getenv("XERO_COMPACT_EVERY", 10))
+except (ValueError, TypeError):
+    XERO_COMPACT_EVERY = 10
+
+# Print fetched records as a table (needs pandas); wrappers running small jobs can turn it off
+XERO_DISPLAY = os.getenv("XERO_DISPLAY", "true").lower() in ("1", "true", "yes")
+
 # Rate limits with error handling
 try:
     XERO_CALLS_PER_MINUTE = int(os.getenv("XERO_CALLS_PER_MINUTE", 60))
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The Xero scripts import each other by name and share etl_common/ with the QuickBooks exporter
+XERO_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(XERO_DIR), str(XERO_DIR.parent)]
@@ -0,0 +1,72 @@
+import json
+import pytest
+from extracts import column_projector, compile_params, compile_projection, format_value, load_extract_spec
+
+class TestCompileParams:
+    def test_entity_only(self):
+        assert compile_params({"entity": "Invoices"}) == {}
+
+    def test_filters_are_joined_with_and(self):
+        spec = {"entity": "Invoices", "filters": [{"column": "Status", "op": "==", "value": "AUTHORISED"},
+                                                  {"column": "AmountDue", "op": ">", "value": 0}]}
+        assert compile_params(spec) == {"where": 'Status=="AUTHORISED" AND AmountDue>0'}
+
+    def test_order_and_summary_only(self):
+        spec = {"entity": "Invoices", "order": ["Date DESC", "InvoiceNumber"], "summary_only": True}
+        assert compile_params(spec) == {"order": "Date DESC, InvoiceNumber", "summaryOnly": "true"}
+
+    def test_unsupported_operator(self):
+        with pytest.raises(ValueError, match="Unsupported filter operator"):
+            compile_params({"entity": "Invoices", "filters": [{"column": "Total", "op": "LIKE", "value": 1}]})
+
+class TestFormatValue:
+    def test_guid(self):
+        assert format_value("0f3c", "guid") == 'Guid("0f3c")'
+
+    def test_date(self):
+        assert format_value("2024-01-31", "date") == "DateTime(2024, 01, 31)"
+
+    def test_string_is_escaped(self):
+        assert format_value('Say "hi"') == '"Say \\"hi\\""'
+
+    def test_bool(self):
+        assert format_value(False) == "false"
+
+class TestColumnProjector:
+    def test_no_columns_keeps_everything(self):
+        assert column_projector({"entity": "Invoices"}) is None
+
+    def test_keeps_endpoint_id(self):
+        project = column_projector({"entity": "Invoices", "columns": ["Total"]})
+        items = [{"InvoiceID": "a", "Total": 5, "Status": "PAID"}]
+        assert project(items) == [{"InvoiceID": "a", "Total": 5}]
+
+    def test_irregular_plural_id(self):
+        project = column_projector({"entity": "TrackingCategories", "columns": ["Name"]})
+        items = [{"TrackingCategoryID": "t1", "Name": "Region", "Status": "ACTIVE"}]
+        assert project(items) == [{"TrackingCategoryID": "t1", "Name": "Region"}]
+
+    def test_key_from_spec(self):
+        project = column_projector({"entity": "Currencies", "columns": ["Description"], "key": "Code"})
+        items = [{"Code": "NZD", "Description": "New Zealand Dollar"}]
+        assert project(items) == [{"Code": "NZD", "Description": "New Zealand Dollar"}]
+
+    def test_no_id_column_asks_for_key(self):
+        project = column_projector({"entity": "Currencies", "columns": ["Description"]})
+        with pytest.raises(ValueError, match='Add "key" to the extract spec'):
+            project([{"Code": "NZD", "Description": "New Zealand Dollar"}])
+
+class TestCompileProjection:
+    def test_full_extract(self):
+        assert compile_projection({"entity": "Invoices"}) is None
+
+    def test_columns_and_summary(self):
+        spec = {"entity": "Invoices", "columns": ["Total", "AmountDue"], "summary_only": True}
+        assert compile_projection(spec) == {"columns": ["AmountDue", "Total"], "summary_only": True}
+
+class TestLoadExtractSpec:
+    def test_requires_entity(self, tmp_path):
+        path = tmp_path / "spec.json"
+        path.write_text(json.dumps({"columns": ["Total"]}))
+        with pytest.raises(ValueError, match="no entity"):
+            load_extract_spec(path)
@@ -0,0 +1,32 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+pytest.importorskip("dotenv")
+requests = pytest.importorskip("requests")
+from xeroEtlApi import iter_xero_pages
+
+def fake_response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {"Retry-After": "0"}
+    response.ok = status_code < 400
+    if not response.ok:
+        response.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+    return response
+
+class TestPagesReleaseConnections:
+    @pytest.mark.parametrize("status_code", [400, 500])
+    def test_failed_response_is_closed(self, status_code):
+        failed = fake_response(status_code)
+        with patch("requests.get", return_value=failed):
+            with pytest.raises(requests.HTTPError):
+                list(iter_xero_pages("Invoices", "token", "tenant"))
+        failed.close.assert_called_once()
+
+    def test_rate_limited_response_is_closed(self):
+        limited = fake_response(429)
+        with patch("requests.get", side_effect=[limited, fake_response(404)]), \
+                patch("xeroEtlApi.time.sleep"):
+            with pytest.raises(requests.HTTPError):
+                list(iter_xero_pages("Invoices", "token", "tenant"))
+        limited.close.assert_called_once()
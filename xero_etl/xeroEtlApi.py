@@ -1,13 +1,24 @@
 import os
-import requests
 import base64
 import time
 import json
-import pandas as pd
 import logging
+import sys
 from datetime import datetime
 from pathlib import Path
-from config import XERO_BASE_URL, XERO_CLIENT_ID, XERO_CLIENT_SECRET
+from config import (XERO_BASE_URL, XERO_CLIENT_ID, XERO_CLIENT_SECRET, XERO_JSON_DECODER,
+                    XERO_OUTPUT_MODE, XERO_COMPACT_EVERY, XERO_OUTPUT_ROOT, XERO_OUTPUT_COMPRESSION,
+                    XERO_SCRATCH_DIR, XERO_DISPLAY)
+
+# Helpers shared with the QuickBooks exporter live in etl_common/ next to this folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from etl_common.pipeline import run_pipeline, CsvFileSink
+from etl_common.decoding import iter_json_records
+from etl_common.snapshots import SnapshotSink
+from extracts import load_extract_spec, compile_params, column_projector, compile_projection
+
+# requests and pandas are imported where they are used, so small jobs that
+# never display a table don't pay for pandas (see startup_benchmark.py)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -52,6 +63,8 @@ def save_tokens(tokens):
     logger.info(f"Tokens saved securely to {token_file}")
 
 def refresh_access_tokens(refresh_token):
+    import requests
+
     auth = base64.b64encode(
         f"{CLIENT_ID}:{CLIENT_SECRET}".encode()
     ).decode()
@@ -89,6 +102,8 @@ def get_access_token():
     return new_tokens["access_token"]
 
 def get_tenant_id(access_token):
+    import requests
+
     response = requests.get(
         CONNECTIONS_URL,
         headers={"Authorization": f"Bearer {access_token}"}
@@ -99,9 +114,15 @@ def get_tenant_id(access_token):
         raise XeroConnectionError("No Xero connections found")
     return connections[1]["tenantId"]
 
-def fetch_xero_api(endpoint, access_token, tenant_id, params=None):
+def iter_xero_pages(endpoint, access_token, tenant_id, params=None):
+    """Yield the items of an endpoint one page at a time.
+
+    Journals are paged by offset, so each request depends on the previous
+    page and has to stay sequential; other endpoints use page numbers.
+    """
+    import requests
+
     offset  = 0
-    all_items = []
     max_iteration  = 1000
     iteration = 0
 
@@ -120,28 +141,29 @@ def fetch_xero_api(endpoint, access_token, tenant_id, params=None):
             "Accept": "application/json"
          }
 
-        response = requests.get(url, headers=headers, params=current_params)
+        response = requests.get(url, headers=headers, params=current_params, stream=True)
 
         if response.status_code == 429:
+            response.close()
             wait = int(response.headers.get("Retry-After", 60))
             logger.warning(f"Rate limited. Waiting {wait} seconds...")
             time.sleep(wait)
             continue
 
+        if not response.ok:
+            response.close()
         response.raise_for_status()
-        data = response.json()
-        items = data.get(endpoint, [])
+        items = list(iter_json_records(response, key=endpoint, decoder=XERO_JSON_DECODER))
 
         if not items or len(items) == 0:
             break
-        all_items.extend(items)
+        yield items
         if len(items) < 100:
             break
         offset += len(items)
         iteration +=1
     if iteration >= max_iteration:
         logger.warning(f"Reached maximum iterations ({max_iteration}). Stopping fetch.")
-    return {endpoint: all_items}
 
 def get_safe_onedrive_path():
     possible_paths = [
@@ -156,59 +178,100 @@ def get_safe_onedrive_path():
     logger.warning("OneDrive not found. Saving to current directory.")
     return Path(".")
 
-def save_to_csv(data, endpoint):
-
-    items = data.get(endpoint, [])
-    if not items:
-        logger.info(f"No data found for {endpoint}")
-        return
-    
+def get_xero_folder():
+    if XERO_OUTPUT_ROOT:
+        xero_folder = Path(XERO_OUTPUT_ROOT).expanduser()
+        xero_folder.mkdir(parents=True, exist_ok=True)
+        return xero_folder
 
     base_path = get_safe_onedrive_path()
     xero_folder = base_path / "Xero_Data"
     xero_folder.mkdir(exist_ok=True)
+    return xero_folder
 
+def get_scratch_dir():
+    """Local staging area for exports, outside the synced folder"""
+    if XERO_SCRATCH_DIR:
+        return Path(XERO_SCRATCH_DIR).expanduser()
+    return Path.home() / ".xero_app" / "staging"
 
+def get_csv_path(endpoint):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{endpoint}_{timestamp}.csv"
-    filepath = xero_folder / filename
-
-
-    df = pd.DataFrame(items)
-    df.to_csv(filepath, index=False)
-    logger.info(f"Saved {len(items)} {endpoint} records to: {filepath}")
+    return get_xero_folder() / filename
 
 def display_data(data, endpoint):
     items = data.get(endpoint, [])
     if not items:
         logger.info(f"No data found for {endpoint}")
         return
-    
+
+    import pandas as pd
+
     df = pd.DataFrame(items)
     print(f"\n{endpoint} Data:")
     print("=" * 50)
     print(df.to_string(index=False))
 
-def process_endpoint_data(endpoint, access_token, tenant_id):
+class DisplaySink:
+    """Pipeline sink that collects every page and prints them as one table."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.items = []
+
+    def write(self, items):
+        self.items.extend(items)
+
+    def close(self):
+        display_data({self.endpoint: self.items}, self.endpoint)
+
+def process_endpoint_data(endpoint, access_token, tenant_id, spec=None):
     try:
-        fetched_data = fetch_xero_api(endpoint, access_token, tenant_id)
-        display_data(fetched_data, endpoint)
-        save_to_csv(fetched_data, endpoint)
+        params = compile_params(spec) if spec else None
+        transform = column_projector(spec) if spec else None
+        projection = compile_projection(spec) if spec else None
+        # Filtered extracts don't see every record, so they can't detect deletes
+        full_extract = not (params and "where" in params)
+
+        if XERO_OUTPUT_MODE == "full":
+            output = CsvFileSink(get_csv_path(endpoint), compression=XERO_OUTPUT_COMPRESSION,
+                                 scratch_dir=get_scratch_dir())
+        else:
+            output = SnapshotSink(get_xero_folder(), endpoint, key=spec.get("key") if spec else None,
+                                  detect_deletes=full_extract, compact_every=XERO_COMPACT_EVERY,
+                                  compression=XERO_OUTPUT_COMPRESSION, scratch_dir=get_scratch_dir(),
+                                  index_dir=Path.home() / ".xero_app" / "snapshots", projection=projection)
+
+        pages = iter_xero_pages(endpoint, access_token, tenant_id, params)
+        sinks = [DisplaySink(endpoint), output] if XERO_DISPLAY else [output]
+        total = run_pipeline(pages, transform, sinks)
+        if XERO_OUTPUT_MODE != "full":
+            logger.info(f"Snapshot of {total} {endpoint} records updated in {output.folder} "
+                        "(inserted: {insert}, updated: {update}, deleted: {delete})".format(**output.counts))
+        elif total:
+            logger.info(f"Saved {total} {endpoint} records to: {output.path}")
+        else:
+            logger.info(f"No data found for {endpoint}")
     except Exception as e:
         logger.error(f"Error processing {endpoint}: {str(e)}")
 
 def main():
     try:
         print("Available Xero endpoints: Journals, Invoices, Contacts, Items, Accounts, BankTransactions, etc.")
-        endpoint = input("Enter endpoint to fetch (default: Invoices): ").strip()
+        endpoint = input("Enter endpoint to fetch or an extract spec .json file (default: Invoices): ").strip()
         
 
+        spec = None
         if not endpoint:
             endpoint = "Invoices"
+        elif endpoint.lower().endswith(".json"):
+            spec = load_extract_spec(endpoint)
+            endpoint = spec["entity"]
         
         access_token = get_access_token()
         tenant_id = get_tenant_id(access_token)
-        process_endpoint_data(endpoint, access_token, tenant_id)
+        process_endpoint_data(endpoint, access_token, tenant_id, spec)
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
         raise